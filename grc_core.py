@@ -0,0 +1,283 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import io
+import pdfplumber
+import pypdfium2 as pdfium
+import xlsxwriter
+import re
+import threading
+from numba import njit
+
+# Panel rows in PDF schedules: type, quantity, height, length, depth. The quantifiers are
+# possessive (Python 3.11+): adjacent classes never overlap, so backtracking could not find
+# another match anyway and is ruled out on long runs of whitespace.
+_PANEL_RE = re.compile(
+    r"(?P<type>Grc\.[\w\.]++)\s++(?P<qty>\d++)\s++(?P<height>\d{3,4}+)\s++(?P<length>\d{3,4}+)\s++(?P<depth>\d{3,4}+)"
+)
+
+# PDFium is not thread-safe, and Streamlit runs each session's script on its own thread, so
+# every call into pypdfium2 (open, iterate, close) has to hold this lock
+_PDFIUM_LOCK = threading.Lock()
+
+# Columns of the panels table produced by the parsers (one row per physical panel)
+_PANEL_COLUMNS = ['Type', 'Height', 'Width', 'Depth', 'Weight']
+
+# Column layout and dtypes of the Beds and Truck Summary tables
+_BED_COLUMNS = {
+    'Length': 'float64', 'Height': 'float64', 'Width': 'int32',
+    'Weight': 'float64', 'Num Panels': 'int32', 'Panel Types': 'string',
+}
+_TRUCK_COLUMNS = {'Truck #': 'int32', 'Num Beds': 'int32', 'Total Weight (kg)': 'float64', 'Panel Types': 'string'}
+
+# --- Core Logic Functions ---
+
+@njit(cache=True)
+def _pack(sizes, weights, capacity, weight_limit):
+    """Assigns items to bins by Best-Fit and returns the bin index of every item.
+
+    Open bins are kept sorted by (remaining capacity, bin index), so the tightest bin
+    with room for an item is found by binary search instead of scanning every bin.
+    """
+    n = len(sizes)
+    used_weight = np.zeros(n)
+    remaining = np.empty(n)
+    slot_bin = np.empty(n, dtype=np.int64)
+    assignment = np.empty(n, dtype=np.int64)
+    num_bins = 0
+    for i in range(n):
+        # Tightest bin with enough room, skipping any that would go over the weight limit
+        k = np.searchsorted(remaining[:num_bins], sizes[i])
+        while k < num_bins and used_weight[slot_bin[k]] + weights[i] > weight_limit:
+            k += 1
+        if k < num_bins:
+            target = slot_bin[k]
+            left = remaining[k] - sizes[i]
+        else:
+            target = num_bins
+            left = capacity - sizes[i]
+            num_bins += 1
+        used_weight[target] += weights[i]
+        assignment[i] = target
+
+        # Move the bin to its new sorted slot; it can only move towards the front
+        pos = np.searchsorted(remaining[:k], left)
+        while pos < k and remaining[pos] == left and slot_bin[pos] < target:
+            pos += 1
+        for j in range(k, pos, -1):
+            remaining[j] = remaining[j - 1]
+            slot_bin[j] = slot_bin[j - 1]
+        remaining[pos] = left
+        slot_bin[pos] = target
+    return assignment
+
+def _bin_runs(assignment):
+    """Returns the stable order that lines items up bin by bin, and where each bin's run starts."""
+    order = np.argsort(assignment, kind='stable')
+    return order, np.searchsorted(assignment[order], np.arange(assignment.max() + 1))
+
+def compute_beds_and_trucks(panels, bed_width=2400, bed_weight_limit=2500, truck_weight_limit=15000, truck_max_length=13620):
+    """Takes the panels table and groups the panels into beds and trucks (Best-Fit Decreasing).
+
+    Returns the Beds table and the Truck Summary table, with the per-truck totals computed here once.
+    """
+    panels_df = pd.DataFrame(panels, columns=_PANEL_COLUMNS)
+    if panels_df.empty:
+        return (
+            pd.DataFrame(columns=list(_BED_COLUMNS)).astype(_BED_COLUMNS),
+            pd.DataFrame(columns=list(_TRUCK_COLUMNS)).astype(_TRUCK_COLUMNS),
+        )
+    # Heavier items first among equal sizes, so the weight limit is met by the big items early
+    panels_df = panels_df.sort_values(['Depth', 'Weight'], ascending=False, kind='stable')
+    bed_of = _pack(
+        panels_df['Depth'].to_numpy(np.float64), panels_df['Weight'].to_numpy(np.float64), bed_width, bed_weight_limit
+    )
+    
+    # Line panels up bed by bed, then reduce each bed's contiguous run in one C-level call
+    order, starts = _bin_runs(bed_of)
+    types = panels_df['Type'].astype(str).where(panels_df['Type'].notna(), "").to_numpy()[order]
+    bed_summaries = pd.DataFrame({
+        'Length': np.maximum.reduceat(panels_df['Width'].to_numpy()[order], starts),
+        'Height': np.maximum.reduceat(panels_df['Height'].to_numpy()[order], starts),
+        'Width': bed_width,
+        'Weight': np.add.reduceat(panels_df['Weight'].to_numpy()[order], starts),
+        'Num Panels': np.diff(starts, append=len(order)),
+        'Panel Types': [", ".join(t for t in bed_types if t) for bed_types in np.split(types, starts[1:])],
+    }).astype(_BED_COLUMNS)
+
+    # Longest (then heaviest) beds first; lexsort is stable, so equal beds keep their order
+    lengths = bed_summaries['Length'].to_numpy(np.float64)
+    weights = bed_summaries['Weight'].to_numpy(np.float64)
+    bed_order = np.lexsort((-weights, -lengths))
+    truck_of = _pack(lengths[bed_order], weights[bed_order], truck_max_length, truck_weight_limit)
+
+    # Same run-wise reduction as for beds, over the beds in packing order
+    truck_order, truck_starts = _bin_runs(truck_of)
+    loaded = bed_order[truck_order]
+    bed_types = bed_summaries['Panel Types'].to_numpy(dtype=object)[loaded]
+    trucks = pd.DataFrame({
+        'Truck #': np.arange(1, len(truck_starts) + 1),
+        'Num Beds': np.diff(truck_starts, append=len(loaded)),
+        'Total Weight (kg)': np.add.reduceat(weights[loaded], truck_starts),
+        'Panel Types': [", ".join(truck_types) for truck_types in np.split(bed_types, truck_starts[1:])],
+    }).astype(_TRUCK_COLUMNS)
+
+    return bed_summaries, trucks
+
+def _write_sheet(workbook, name, header, rows):
+    """Writes a header and then the rows to a new worksheet, one row at a time."""
+    worksheet = workbook.add_worksheet(name)
+    worksheet.write_row(0, 0, header)
+    for row, values in enumerate(rows, start=1):
+        worksheet.write_row(row, 0, values)
+
+def export_to_excel(beds, trucks):
+    """Exports the bed and truck data to an in-memory Excel file."""
+    output = io.BytesIO()
+    # constant_memory flushes each row as soon as the next one starts, so rows must be written in order.
+    # Panel types are plain data, so one starting with '=' must not be written as a formula
+    with xlsxwriter.Workbook(output, {'constant_memory': True, 'strings_to_formulas': False}) as workbook:
+        _write_sheet(workbook, "Beds", beds.columns, beds.itertuples(index=False, name=None))
+        _write_sheet(workbook, "Truck Summary", trucks.columns, trucks.itertuples(index=False, name=None))
+        _write_sheet(workbook, "Summary", ["Metric", "Value"], [["Total Beds", len(beds)], ["Total Trucks", len(trucks)]])
+    output.seek(0)
+    return output
+
+def _pdfium_schedule_pages(file_path):
+    """Returns the indices of the PDF pages whose text mentions "Grc.", using PDFium's fast extraction."""
+    # PDFium returns text in content-stream order, which scrambles tables drawn one column at a
+    # time, so it only decides which pages are worth a layout pass, never what the rows say
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            pages = []
+            for index, page in enumerate(pdf):
+                textpage = page.get_textpage()
+                # Scanned, image-only pages have no text objects; skip them without building a string
+                if textpage.count_chars() and "Grc." in textpage.get_text_range():
+                    pages.append(index)
+                textpage.close()
+                page.close()
+            return pages
+        finally:
+            pdf.close()
+
+def _pdfplumber_page_texts(file_path, pages):
+    """Yields the layout-ordered text of the given PDF pages using pdfplumber."""
+    with pdfplumber.open(file_path) as pdf:
+        # Drop each page's cached layout objects so only one page is held at a time
+        for index in pages:
+            page = pdf.pages[index]
+            text = page.extract_text() or ""
+            page.close()
+            yield text
+
+def _find_panel_rows(page_texts):
+    """Collects the regex groups of every panel row, scanning each page as it is extracted."""
+    return [match.groups() for text in page_texts for match in _PANEL_RE.finditer(text)]
+
+def extract_pdf_panel_rows(file_path):
+    """Extracts the raw (type, qty, height, length, depth) schedule rows from a PDF path or binary stream."""
+    pages = _pdfium_schedule_pages(file_path)
+    return _find_panel_rows(_pdfplumber_page_texts(file_path, pages))
+
+def build_pdf_panels(matches, spacing=100, thickness=0.016, density=2100, buffer=0.10):
+    """Turns extracted PDF schedule rows into a panels table, one row per physical panel."""
+    if not matches:
+        return pd.DataFrame(columns=_PANEL_COLUMNS)
+
+    types, qty, height, length, depth = zip(*matches)
+    qty = np.fromiter(qty, dtype=np.int64, count=len(qty))
+    height = np.fromiter(height, dtype=np.int64, count=len(height))
+    length = np.fromiter(length, dtype=np.int64, count=len(length))
+    depth = np.fromiter(depth, dtype=np.int64, count=len(depth))
+    area_m2 = (length / 1000) * (height / 1000)
+    weight = np.round(area_m2 * thickness * density * (1 + buffer), 2)
+
+    # One row per physical panel: repeat each matched schedule row by its quantity. Types
+    # repeat heavily, so they are stored as category codes rather than one string per panel
+    rows = np.repeat(np.arange(len(types)), qty)
+    type_cat = pd.Categorical(types)
+    return pd.DataFrame({
+        "Type": pd.Categorical.from_codes(type_cat.codes[rows], type_cat.categories), "Height": depth[rows] + 2 * spacing,
+        "Width": length[rows] + 2 * spacing, "Depth": height[rows] + 2 * spacing, "Weight": weight[rows],
+    })
+
+def read_raw_table(file_bytes, ext, delimiter):
+    """Reads an uploaded CSV/XLSX file without a header row."""
+    if ext == "xlsx":
+        # Check the signature pandas would sniff (ZIP for xlsx, OLE2 for legacy xls) instead of
+        # attempting a full workbook parse on a misnamed CSV and catching the failure
+        if file_bytes.startswith((b"PK\x03\x04", b"\xd0\xcf\x11\xe0")):
+            return pd.read_excel(io.BytesIO(file_bytes), header=None, engine="calamine")
+        st.warning("⚠️ This file is not a standard Excel file. Attempting to read as a semicolon-delimited CSV.")
+    try:
+        return pd.read_csv(io.BytesIO(file_bytes), header=None, sep=delimiter, encoding='utf-8-sig', engine='pyarrow')
+    except pd.errors.ParserError:
+        # pyarrow rejects rows shorter than the widest one (e.g. a trailing "Total;;" line);
+        # the C engine pads them with NaN
+        return pd.read_csv(io.BytesIO(file_bytes), header=None, sep=delimiter, encoding='utf-8-sig', engine='c')
+
+def parse_excel_panels(df, spacing, column_map):
+    """Parses panel data from a dataframe into a panels table using a user-provided column map."""
+    type_col = column_map["panel type"]
+    len_col = column_map["length (mm)"]
+    hgt_col = column_map["height (mm)"]
+    dep_col = column_map["depth (mm)"]
+    wgt_col = column_map.get("weight (kg)")
+
+    if not all([type_col, len_col, hgt_col, dep_col]):
+        st.error("Error: Please map all required dimension columns (Type, Length, Height, Depth).")
+        return pd.DataFrame(columns=_PANEL_COLUMNS)
+
+    # A repeated header (e.g. several blank cells read as "nan") selects a frame, not a column
+    mapped = dict.fromkeys(col for col in [type_col, len_col, hgt_col, dep_col, wgt_col] if col)
+    duplicated = [str(col) for col in mapped if (df.columns == col).sum() > 1]
+    if duplicated:
+        st.error(
+            f"Error: These mapped columns appear more than once in the header row: {', '.join(duplicated)}. "
+            "Please rename the duplicate headers or pick another header row."
+        )
+        return pd.DataFrame(columns=_PANEL_COLUMNS)
+
+    # Coerce each mapped column once and work on whole arrays instead of row by row
+    types = df[type_col].astype('category')
+    l_arr = pd.to_numeric(df[len_col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    h_arr = pd.to_numeric(df[hgt_col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    d_arr = pd.to_numeric(df[dep_col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    if wgt_col:
+        w_arr = pd.to_numeric(df[wgt_col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    else:
+        w_arr = np.full(len(df), np.nan)
+
+    valid = (
+        ~(np.isnan(l_arr) | np.isnan(h_arr) | np.isnan(d_arr))
+        & types.notna().to_numpy()
+        & (types.astype(str).str.strip() != "").to_numpy()
+    )
+    types = types[valid].astype(str).astype('category').array
+    l_arr, h_arr, d_arr, w_arr = l_arr[valid], h_arr[valid], d_arr[valid], w_arr[valid]
+
+    # Estimate the weight wherever the sheet does not provide a positive one
+    thickness, density, buffer = 0.016, 2100, 0.10
+    area_m2 = (l_arr / 1000) * (h_arr / 1000)
+    volume_m3 = area_m2 * np.where(d_arr > 5, d_arr / 1000, thickness)
+    estimated = np.round(volume_m3 * density * (1 + buffer), 2)
+    with np.errstate(invalid='ignore'):
+        has_weight = ~np.isnan(w_arr) & (w_arr > 0)
+    weight = np.where(has_weight, w_arr, estimated)
+
+    panels = pd.DataFrame({
+        "Type": types, "Height": d_arr + 2 * spacing, "Width": l_arr + 2 * spacing,
+        "Depth": h_arr + 2 * spacing, "Weight": weight,
+    })
+
+    if panels.empty:
+         st.warning("Warning: Could not parse any valid panels.")
+    else:
+        # Report the dropped rows once, leaving out fully blank separator rows
+        skipped = df.loc[~valid & df.notna().any(axis=1).to_numpy()]
+        if not skipped.empty:
+            st.warning(f"⚠️ Skipped {len(skipped)} rows with a missing type or non-numeric dimensions.")
+            st.dataframe(skipped)
+    return panels
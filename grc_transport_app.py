@@ -1,143 +1,36 @@
 import streamlit as st
-import pandas as pd
 import io
-import tempfile
-import pdfplumber
-import re
-
-# --- Core Logic Functions ---
-
-def compute_beds_and_trucks(panels, bed_width=2400, bed_weight_limit=2500, truck_weight_limit=15000, truck_max_length=13620):
-    """Takes a list of panels and groups them into beds and trucks."""
-    beds = []
-    for panel in panels:
-        placed = False
-        for bed in beds:
-            used_depth = sum(p['Depth'] for p in bed)
-            total_weight = sum(p['Weight'] for p in bed)
-            if used_depth + panel['Depth'] <= bed_width and total_weight + panel['Weight'] <= bed_weight_limit:
-                bed.append(panel)
-                placed = True
-                break
-        if not placed:
-            beds.append([panel])
-    
-    bed_summaries = []
-    for bed in beds:
-        bed_length = max(p['Width'] for p in bed)
-        bed_height = max(p['Height'] for p in bed)
-        bed_weight = sum(p['Weight'] for p in bed)
-        panel_types = ", ".join(str(p['Type']) for p in bed if pd.notna(p['Type']))
-        bed_summaries.append({
-            'Length': bed_length, 'Height': bed_height, 'Width': bed_width,
-            'Weight': bed_weight, 'Num Panels': len(bed), 'Panel Types': panel_types
-        })
-        
-    trucks = []
-    for bed in bed_summaries:
-        placed = False
-        for truck in trucks:
-            used_length = sum(b['Length'] for b in truck)
-            total_weight = sum(b['Weight'] for b in truck)
-            if used_length + bed['Length'] <= truck_max_length and total_weight + bed['Weight'] <= truck_weight_limit:
-                truck.append(bed)
-                placed = True
-                break
-        if not placed:
-            trucks.append([bed])
-            
-    return bed_summaries, trucks
-
-def export_to_excel(beds, trucks):
-    """Exports the bed and truck data to an in-memory Excel file."""
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        pd.DataFrame(beds).to_excel(writer, index=False, sheet_name="Beds")
-        truck_summary = []
-        for i, truck in enumerate(trucks):
-            all_panel_types = ", ".join(b['Panel Types'] for b in truck)
-            truck_summary.append({
-                "Truck #": i + 1, "Num Beds": len(truck), "Total Weight (kg)": sum(b['Weight'] for b in truck),
-                "Panel Types": all_panel_types
-            })
-        pd.DataFrame(truck_summary).to_excel(writer, index=False, sheet_name="Truck Summary")
-        summary = pd.DataFrame({"Metric": ["Total Beds", "Total Trucks"], "Value": [len(beds), len(trucks)]})
-        summary.to_excel(writer, index=False, sheet_name="Summary")
-    output.seek(0)
-    return output
-
-def parse_pdf_panels(file_path, spacing=100, thickness=0.016, density=2100, buffer=0.10):
-    """Parses panel data from a PDF file."""
-    panels = []
-    with pdfplumber.open(file_path) as pdf:
-        text = "\n".join(page.extract_text() for page in pdf.pages if page.extract_text())
-    pattern = re.compile(r"(Grc\.[\w\.]+)\s+(\d+)\s+(\d{3,4})\s+(\d{3,4})\s+(\d{3,4})")
-    matches = pattern.findall(text)
-    def estimate_weight(length_mm, height_mm):
-        area_m2 = (length_mm / 1000) * (height_mm / 1000)
-        volume_m3 = area_m2 * thickness
-        return round(volume_m3 * density * (1 + buffer), 2)
-    for match_data in matches:
-        try:
-            panel_type, qty, height, length, depth = match_data
-            for _ in range(int(qty)):
-                h = int(height) + 2 * spacing
-                l = int(length) + 2 * spacing
-                d = int(depth) + 2 * spacing
-                weight = estimate_weight(int(length), int(height))
-                panels.append({ "Type": panel_type, "Height": d, "Width": l, "Depth": h, "Weight": weight })
-        except Exception as e:
-            st.error(f"❌ Error parsing PDF match: {e}")
-    return panels
-
-def parse_excel_panels(df, spacing, column_map):
-    """Parses panel data from a dataframe using a user-provided column map."""
-    panels = []
-    
-    type_col = column_map["panel type"]
-    len_col = column_map["length (mm)"]
-    hgt_col = column_map["height (mm)"]
-    dep_col = column_map["depth (mm)"]
-    wgt_col = column_map.get("weight (kg)")
-
-    if not all([type_col, len_col, hgt_col, dep_col]):
-        st.error("Error: Please map all required dimension columns (Type, Length, Height, Depth).")
-        return []
-
-    for index, row in df.iterrows():
-        try:
-            panel_type_value = row[type_col]
-            if pd.isna(panel_type_value) or str(panel_type_value).strip() == "":
-                continue
-
-            l_num = pd.to_numeric(row[len_col], errors='coerce')
-            h_num = pd.to_numeric(row[hgt_col], errors='coerce')
-            d_num = pd.to_numeric(row[dep_col], errors='coerce')
-
-            if pd.isna(l_num) or pd.isna(h_num) or pd.isna(d_num):
-                continue
-            
-            h, l, d = h_num + 2 * spacing, l_num + 2 * spacing, d_num + 2 * spacing
-
-            weight = 0
-            if wgt_col and pd.notna(row[wgt_col]): 
-                weight_num = pd.to_numeric(row[wgt_col], errors='coerce')
-                if pd.notna(weight_num) and weight_num > 0:
-                    weight = weight_num
-            
-            if weight == 0:
-                thickness, density, buffer = 0.016, 2100, 0.10
-                area_m2 = (l_num / 1000) * (h_num / 1000)
-                volume_m3 = area_m2 * (d_num / 1000 if d_num > 5 else thickness)
-                weight = round(volume_m3 * density * (1 + buffer), 2)
-
-            panels.append({ "Type": str(row[type_col]), "Height": d, "Width": l, "Depth": h, "Weight": weight })
-        except Exception as e:
-            st.error(f"❌ An error occurred on row index {index}: {e}")
-
-    if not panels:
-         st.warning("Warning: Could not parse any valid panels.")
-    return panels
+from grc_core import (
+    read_raw_table, compute_beds_and_trucks, export_to_excel,
+    extract_pdf_panel_rows, build_pdf_panels, parse_excel_panels,
+)
+
+# --- Streamlit Helpers ---
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_raw(file_bytes, ext, delimiter):
+    """Cached read_raw_table, keyed on the uploaded file bytes, so reruns do not re-read the file."""
+    return read_raw_table(file_bytes, ext, delimiter)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_pdf_rows(file_bytes):
+    """Extracts the schedule rows of an uploaded PDF once; cached on the file bytes alone."""
+    return extract_pdf_panel_rows(io.BytesIO(file_bytes))
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_pdf_panels(file_bytes, spacing):
+    """Cached PDF panels table; a spacing change reuses the extracted rows and only rebuilds the table."""
+    return build_pdf_panels(load_pdf_rows(file_bytes), spacing)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_excel_panels(df, spacing, column_map):
+    """Cached parse_excel_panels, keyed on the mapped dataframe, spacing and column mapping."""
+    return parse_excel_panels(df, spacing, column_map)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def plan_transport(panels):
+    """Cached compute_beds_and_trucks, so reruns with the same panels do not repack them."""
+    return compute_beds_and_trucks(panels)
 
 def display_ui_and_process(df, spacing):
     """Takes a cleaned dataframe and displays the UI for column mapping and analysis."""
@@ -151,10 +44,11 @@ def display_ui_and_process(df, spacing):
     st.header("3. Map Your Columns")
     st.info("The app will try to guess the correct columns. Please verify them.")
     
-    app_columns_lower = [col.lower() for col in app_columns]
+    column_index = {}
+    for i, col in enumerate(app_columns):
+        column_index.setdefault(col.lower(), i)  # first match wins, as with list.index
     def find_default_index(target_name):
-        try: return app_columns_lower.index(target_name)
-        except ValueError: return 0
+        return column_index.get(target_name, 0)
 
     col1_map, col2_map = st.columns(2)
     with col1_map:
@@ -172,24 +66,16 @@ def display_ui_and_process(df, spacing):
             "height (mm)": hgt_col, "depth (mm)": dep_col,
             "weight (kg)": wgt_col,
         }
-        panels = parse_excel_panels(df, spacing, column_map)
+        panels = load_excel_panels(df, spacing, column_map)
         
-        if panels:
-            beds, trucks = compute_beds_and_trucks(panels)
+        if not panels.empty:
+            beds, trucks = plan_transport(panels)
             st.success(f"Parsed {len(panels)} panels, which fit into {len(beds)} beds and {len(trucks)} trucks.")
             
             st.subheader("Bed Summary")
-            st.dataframe(pd.DataFrame(beds))
+            st.dataframe(beds)
             st.subheader("Truck Summary")
-            truck_summary_list = []
-            for i, truck in enumerate(trucks):
-                all_panel_types = ", ".join(b['Panel Types'] for b in truck)
-                truck_summary_list.append({
-                    "Truck #": i + 1, "Num Beds": len(truck),
-                    "Total Weight (kg)": sum(b['Weight'] for b in truck),
-                    "Panel Types": all_panel_types
-                })
-            st.dataframe(pd.DataFrame(truck_summary_list))
+            st.dataframe(trucks)
 
             output = export_to_excel(beds, trucks)
             st.download_button("Download Transport Plan", data=output, file_name="transport_plan.xlsx")
@@ -210,12 +96,9 @@ if uploaded_file:
         analyze_pdf = st.button("Run PDF Analysis")
         if analyze_pdf:
             try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_file_path = tmp_file.name
-                panels = parse_pdf_panels(tmp_file_path, spacing)
-                if panels:
-                    beds, trucks = compute_beds_and_trucks(panels)
+                panels = load_pdf_panels(uploaded_file.getvalue(), spacing)
+                if not panels.empty:
+                    beds, trucks = plan_transport(panels)
                     st.success(f"Parsed {len(panels)} panels, which fit into {len(beds)} beds and {len(trucks)} trucks.")
                     output = export_to_excel(beds, trucks)
                     st.download_button("Download Transport Plan", data=output, file_name="transport_plan.xlsx")
@@ -234,25 +117,11 @@ if uploaded_file:
         header_row = st.number_input("Which row number contains the headers? (First row is 0)", min_value=0, value=2)
 
         try:
-            df_raw = None
-            if file_extension == "xlsx":
-                try:
-                    df_raw = pd.read_excel(uploaded_file, header=None)
-                except Exception as e:
-                    if "Excel file format cannot be determined" in str(e):
-                        st.warning("⚠️ This file is not a standard Excel file. Attempting to read as a semicolon-delimited CSV.")
-                        uploaded_file.seek(0)
-                        df_raw = pd.read_csv(uploaded_file, header=None, sep=';', encoding='utf-8-sig', engine='python')
-                    else:
-                        raise e
-            else: # csv
-                df_raw = pd.read_csv(uploaded_file, header=None, sep=delimiter, encoding='utf-8-sig', engine='python')
+            df_raw = load_raw(uploaded_file.getvalue(), file_extension, delimiter)
 
             # Promote the selected row to header
-            new_header = df_raw.iloc[header_row]
-            df = df_raw[header_row + 1:].copy()
-            df.columns = new_header
-            df = df.reset_index(drop=True)
+            new_header = df_raw.iloc[header_row].astype(str).str.strip()
+            df = df_raw.iloc[header_row + 1:].set_axis(new_header, axis=1).reset_index(drop=True)
             
             # Remove initial unnamed index column if it exists
             if 'unnamed' in str(df.columns[0]).lower():
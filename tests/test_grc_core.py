@@ -0,0 +1,109 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from grc_core import _pack, extract_pdf_panel_rows, parse_excel_panels, read_raw_table
+
+DATA = Path(__file__).parent / "data"
+
+COLUMN_MAP = {
+    "panel type": "Cast unit", "length (mm)": "Length, mm",
+    "height (mm)": "Height, mm", "depth (mm)": "Width, mm",
+    "weight (kg)": None,
+}
+
+
+def test_numeric_looking_panel_types_are_kept_verbatim():
+    df = pd.DataFrame({
+        "Cast unit": [1001, 1002, np.nan, "1.10"],
+        "Length, mm": ["1200", "1300", "1400", "1500"],
+        "Height, mm": ["600", "700", "800", "900"],
+        "Width, mm": ["150", "160", "170", "180"],
+    }, dtype=object)
+    panels = parse_excel_panels(df, 100, COLUMN_MAP)
+    assert list(panels["Type"]) == ["1001", "1002", "1.10"]
+
+
+def test_csv_with_short_trailing_row_loads():
+    raw = read_raw_table((DATA / "short_row.csv").read_bytes(), "csv", ";")
+    assert raw.shape == (5, 4)
+    assert raw.iloc[4, 0] == "Total" and raw.iloc[4, 1:].isna().all()
+
+    df = raw.iloc[2:].set_axis(raw.iloc[1].str.strip(), axis=1).reset_index(drop=True)
+    panels = parse_excel_panels(df, 100, COLUMN_MAP)
+    assert list(panels["Type"]) == ["001", "Grc.B2"]
+
+
+def _column_drawn_pdf(rows):
+    """Builds a one-page PDF table whose cells are drawn one column at a time, top to bottom."""
+    operators = []
+    for column in range(len(rows[0])):
+        operators.append(f"BT /F1 10 Tf {50 + 90 * column} 700 Td")
+        operators += [f"({row[column]}) Tj 0 -20 Td" for row in rows]
+        operators.append("ET")
+    stream = "\n".join(operators).encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R"
+        b" /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+def test_pdf_table_drawn_column_by_column_is_read_row_by_row():
+    rows = [["Grc.A1", "2", "600", "1200", "150"], ["Grc.B2.x", "3", "700", "1300", "160"]]
+    assert extract_pdf_panel_rows(io.BytesIO(_column_drawn_pdf(rows))) == [tuple(row) for row in rows]
+
+
+def test_duplicated_mapped_column_is_rejected_without_crashing():
+    df = pd.DataFrame(
+        [["Grc.A", "1200", "600", "150", "x"], ["Grc.B", "1300", "700", "160", "y"]],
+        columns=["Cast unit", "Length, mm", "Height, mm", "Width, mm", "Cast unit"],
+    )
+    panels = parse_excel_panels(df, 100, COLUMN_MAP)
+    assert panels.empty and list(panels.columns) == ["Type", "Height", "Width", "Depth", "Weight"]
+
+
+def _brute_force_best_fit(sizes, weights, capacity, weight_limit):
+    """Reference Best-Fit: scan every open bin and take the tightest fit, lowest index on ties."""
+    used_size, used_weight, assignment = [], [], []
+    for size, weight in zip(sizes, weights):
+        target, best_slack = len(used_size), None
+        for b in range(len(used_size)):
+            slack = capacity - used_size[b] - size
+            if slack >= 0 and used_weight[b] + weight <= weight_limit and (best_slack is None or slack < best_slack):
+                target, best_slack = b, slack
+        if target == len(used_size):
+            used_size.append(0.0)
+            used_weight.append(0.0)
+        used_size[target] += size
+        used_weight[target] += weight
+        assignment.append(target)
+    return assignment
+
+
+def test_pack_matches_brute_force_best_fit():
+    rng = np.random.default_rng(0)
+    capacity, weight_limit = 100.0, 50.0
+    for _ in range(2000):
+        n = int(rng.integers(1, 40))
+        # Few distinct integer sizes force ties; some items exceed the capacity or the weight limit
+        sizes = rng.choice([10.0, 20.0, 25.0, 30.0, 50.0, 60.0, 100.0, 120.0], size=n)
+        weights = rng.choice([1.0, 5.0, 10.0, 20.0, 30.0, 60.0], size=n)
+        if rng.random() < 0.5:
+            sizes = -np.sort(-sizes)
+        expected = _brute_force_best_fit(sizes, weights, capacity, weight_limit)
+        assert _pack(sizes, weights, capacity, weight_limit).tolist() == expected